@@ -0,0 +1,43 @@
+"""
+Gunicorn config for serving the API in production:
+
+    gunicorn -c gunicorn_conf.py start:app
+
+Each worker is pinned to its own slice of cores so BERT matmuls stay on one
+socket and do not fight each other for the same cores. On multi-socket hosts
+prefer one gunicorn per NUMA node instead:
+
+    numactl --cpunodebind=$N --membind=$N gunicorn -c gunicorn_conf.py start:app
+
+Models load at import time in start.py, so every worker gets its own copy
+after fork and there is no fork-after-load tensor sharing.
+"""
+import os
+
+CORES_PER_WORKER = int(os.environ.get('CORES_PER_WORKER', 4))
+
+_available_cores = sorted(os.sched_getaffinity(0))
+
+bind = '0.0.0.0:8080'
+workers = max(1, len(_available_cores) // CORES_PER_WORKER)
+worker_class = 'gthread'
+threads = 8
+timeout = 120
+preload_app = False
+
+raw_env = [f"OMP_NUM_THREADS={CORES_PER_WORKER}"]
+
+
+def post_fork(server, worker):
+    """Pin the worker to its own contiguous core slice and cap torch threads."""
+    worker_index = (worker.age - 1) % workers
+    cpuset = _available_cores[worker_index * CORES_PER_WORKER:
+                              (worker_index + 1) * CORES_PER_WORKER]
+    if cpuset:
+        os.sched_setaffinity(0, cpuset)
+        server.log.info(f"Worker {worker.pid} pinned to cores {cpuset}")
+    try:
+        import torch
+        torch.set_num_threads(len(cpuset) or CORES_PER_WORKER)
+    except ImportError:
+        pass
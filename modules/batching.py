@@ -0,0 +1,88 @@
+import queue
+import threading
+from typing import *
+from logging import Logger
+
+import numpy as np
+
+from modules.utils.logging_utils import DEFAULT_LOGGER
+
+
+class MicroBatcher:
+    """
+    Request-coalescing queue in front of the NLI model.
+    Concurrent callers submit (text, hypothesis) pairs; a single consumer thread
+    drains up to max_batch of them, runs one batched forward through
+    model.predict_batch and hands each caller back its own result, so N
+    concurrent HTTP requests cost one padded forward instead of N.
+    :param model: NLI model exposing predict_batch and int2label
+    :param logger: logger to use in batcher
+    :param max_batch: max number of requests coalesced into one forward
+    :param max_wait: seconds the consumer waits for extra requests to arrive
+    """
+    def __init__(self, model, logger: Logger = DEFAULT_LOGGER,
+                 max_batch: int = 16, max_wait: float = 0.005):
+
+        self.model = model
+        self.logger = logger
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._consume_loop, daemon=True)
+        self._worker.start()
+        self.logger.info(f"MicroBatcher is running with max_batch={max_batch}, max_wait={max_wait}s")
+
+    def submit(self, text: str, hypothesis: str) -> dict:
+        """
+        Enqueue one pair and block until the consumer thread has processed
+        the batch containing it.
+        :param text: claim text
+        :param hypothesis: hypothesis text
+        :return prediction dict in the same format as model.predict
+        """
+        done = threading.Event()
+        slot = [None]
+        self._queue.put((text, hypothesis, done, slot))
+        done.wait()
+        if isinstance(slot[0], Exception):
+            raise slot[0]
+        return slot[0]
+
+    def _collect_batch(self) -> List[tuple]:
+        """
+        Block for the first item, then drain up to max_batch items,
+        waiting at most max_wait for stragglers.
+        """
+        batch = [self._queue.get()]
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get(timeout=self.max_wait))
+            except queue.Empty:
+                break
+        return batch
+
+    def _consume_loop(self):
+        while True:
+            batch = self._collect_batch()
+            texts = [item[0] for item in batch]
+            hypotheses = [item[1] for item in batch]
+            try:
+                probs = self.model.predict_batch(texts, hypotheses)['probs']
+                results = [self._to_response(p) for p in probs]
+            except Exception as e:
+                self.logger.error(f"[MicroBatcher] batch of {len(batch)} failed: {e}")
+                results = [e] * len(batch)
+            for (_, _, done, slot), result in zip(batch, results):
+                slot[0] = result
+                done.set()
+
+    def _to_response(self, probs) -> dict:
+        """
+        Map one row of normalized probabilities to the API response dict.
+        :param probs: array of class probabilities
+        """
+        return {"label": self.model.int2label.get(np.argmax(probs)),
+                'contradiction_prob': float(probs[0]),
+                'entailment_prob': float(probs[1]),
+                'neutral_prob': float(probs[2])}
@@ -0,0 +1,37 @@
+import os
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import *
+from logging import Logger
+
+import orjson
+
+from modules.utils.logging_utils import get_logger, ROOT_LOGGER_NAME
+
+
+def load_config_and_logger(default_path: str) -> Tuple[dict, Logger]:
+    """
+    Shared entrypoint bootstrap: parse the --config argument, set up the
+    root logger and load the JSON config (orjson reads the raw bytes, no
+    text decode pass).
+    :param default_path: config path used when --config is not given
+    :return tuple of (config dict, configured logger)
+    """
+    parser = ArgumentParser()
+    parser.add_argument('--config', type=str, required=False,
+                        default=os.environ.get('CONFIG_PATH', default_path),
+                        help='path to config')
+    # parse_known_args so importing under a WSGI server (gunicorn keeps its
+    # own argv) does not SystemExit on unrecognized arguments
+    args, _ = parser.parse_known_args()
+    config_path = Path(args.config)
+
+    logger = get_logger(name=ROOT_LOGGER_NAME,
+                        console=True,
+                        log_level="INFO",
+                        propagate=False)
+
+    logger.info(f"Reading config from {config_path.absolute()}")
+    config = orjson.loads(config_path.read_bytes())
+    logger.info(f"Using config {config}")
+    return config, logger
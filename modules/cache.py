@@ -0,0 +1,54 @@
+import threading
+from hashlib import blake2b
+from typing import *
+from logging import Logger
+
+from cachetools import LRUCache
+
+from modules.utils.logging_utils import DEFAULT_LOGGER
+
+
+class PredictionCache:
+    """
+    Thread-safe bounded LRU cache for (text, hypothesis) -> prediction dicts.
+    Repeated queries (evaluation harnesses, client retries) skip the model
+    forward entirely and cost one dict lookup instead.
+    :param logger: logger to use in cache
+    :param maxsize: max number of cached predictions
+    :param report_every: log hit-rate once per this many requests
+    """
+    def __init__(self, logger: Logger = DEFAULT_LOGGER,
+                 maxsize: int = 65536, report_every: int = 10000):
+
+        self.logger = logger
+        self.report_every = report_every
+
+        self._cache = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._requests = 0
+
+    @staticmethod
+    def key(text: str, hypothesis: str) -> bytes:
+        """
+        Compact canonical key for a (text, hypothesis) pair.
+        :param text: claim text
+        :param hypothesis: hypothesis text
+        """
+        raw = (text or '') + '\x1f' + (hypothesis or '')
+        return blake2b(raw.encode('utf-8'), digest_size=16).digest()
+
+    def get(self, key: bytes) -> Optional[dict]:
+        with self._lock:
+            self._requests += 1
+            result = self._cache.get(key)
+            if result is not None:
+                self._hits += 1
+            if self.report_every and self._requests % self.report_every == 0:
+                self.logger.info('[PredictionCache] hit rate %.3f over %d requests',
+                                 self._hits / self._requests, self._requests)
+        return result
+
+    def put(self, key: bytes, result: dict):
+        with self._lock:
+            self._cache[key] = result
@@ -0,0 +1,144 @@
+from typing import *
+from logging import Logger
+
+import torch
+import torch.nn.functional as F
+from sentence_transformers import SentenceTransformer, losses
+
+from modules.model_trainer import BertTrainer
+from modules.utils.logging_utils import DEFAULT_LOGGER
+
+DEFAULT_STUDENT_MODEL = 'sentence-transformers/paraphrase-MiniLM-L6-v2'
+
+
+class Distiller:
+    """
+    Class to distill the served NLI model into a smaller student.
+    The student is trained against a mix of the teacher's soft logits
+    (KL divergence at temperature T) and the hard dataset labels (CE).
+    Data preparation is reused from BertTrainer, so all three dataset
+    formats (snli, fever, mnli) are supported.
+    :param logger: logger to use in model
+    :param teacher_bert_path: path to the fine-tuned teacher sentence-transformer
+    :param teacher_classifier_path: path to the fine-tuned teacher classifier
+    :param student_base_model: base checkpoint for the student
+    :param temperature: softmax temperature for the soft targets
+    :param alpha: weight of the distillation term, (1 - alpha) goes to CE
+    """
+
+    def __init__(self, logger: Logger, teacher_bert_path: str, teacher_classifier_path: str,
+                 train_path: str, dev_path: str, test_path: str, batch_size: int, path_to_save: str,
+                 student_base_model: str = DEFAULT_STUDENT_MODEL,
+                 temperature: float = 2.0, alpha: float = 0.7, **kwargs):
+
+        self.logger = logger or DEFAULT_LOGGER
+        self.temperature = temperature
+        self.alpha = alpha
+        self.path_to_save = path_to_save
+        self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
+
+        self.teacher = SentenceTransformer(teacher_bert_path)
+        self.teacher_classifier = torch.load(teacher_classifier_path, map_location=self.device)
+        self.teacher.eval()
+        self.teacher_classifier.eval()
+        self.logger.info("Teacher models are loaded.")
+
+        # the trainer owns data reading and dataloader construction; its model
+        # is the student so batches are tokenized with the student vocabulary
+        self.trainer = BertTrainer(logger=self.logger, train_path=train_path, dev_path=dev_path,
+                                   test_path=test_path, base_model=student_base_model,
+                                   batch_size=batch_size, path_to_save=path_to_save, **kwargs)
+        self.student = SentenceTransformer(student_base_model)
+        self.trainer.model = self.student
+        self.student_loss = losses.SoftmaxLoss(
+            model=self.student,
+            sentence_embedding_dimension=self.student.get_sentence_embedding_dimension(),
+            num_labels=len(self.trainer.label2int))
+        self.logger.info("Student model is initialized.")
+
+    def _teacher_logits(self, texts_a: List[str], texts_b: List[str]) -> torch.Tensor:
+        """
+        Teacher forward for one batch of sentence pairs.
+        :param texts_a: list of claims
+        :param texts_b: list of hypotheses
+        :return tensor of class logits, one row per pair
+        """
+        with torch.no_grad():
+            emb_a = self.teacher.encode(texts_a, show_progress_bar=False, convert_to_numpy=False)
+            emb_b = self.teacher.encode(texts_b, show_progress_bar=False, convert_to_numpy=False)
+            u = torch.stack(emb_a)
+            v = torch.stack(emb_b)
+            features = torch.cat([u, v, torch.abs(u - v)], dim=1)
+            return self.teacher_classifier(features)
+
+    def _distillation_loss(self, student_logits: torch.Tensor, teacher_logits: torch.Tensor,
+                           labels: torch.Tensor) -> torch.Tensor:
+        """
+        KL(student || teacher) at temperature T plus CE against hard labels.
+        """
+        soft_loss = F.kl_div(F.log_softmax(student_logits / self.temperature, dim=-1),
+                             F.softmax(teacher_logits / self.temperature, dim=-1),
+                             reduction='batchmean') * self.temperature ** 2
+        hard_loss = F.cross_entropy(student_logits, labels)
+        return self.alpha * soft_loss + (1 - self.alpha) * hard_loss
+
+    def prepare_data(self, data_format: str = 'snli'):
+        """
+        Method used for data preparation before distillation, delegates
+        to the corresponding BertTrainer pipeline.
+        :param data_format: one of snli, fever, mnli
+        """
+        preparing = {'snli': self.trainer.preparing_data,
+                     'fever': self.trainer.preparing_data_fever,
+                     'mnli': self.trainer.preparing_data_mnli}
+        preparing[data_format]()
+
+    def train(self, number_of_epochs: int = 1, learning_rate: float = 2e-5):
+        """
+        Method implements the distillation training loop.
+        """
+        dataloader = self.trainer.train_dataloader_nli
+        dataloader.collate_fn = self.student.smart_batching_collate
+        optimizer = torch.optim.AdamW(self.student_loss.parameters(), lr=learning_rate)
+        self.student_loss.to(self.device)
+
+        for epoch in range(number_of_epochs):
+            epoch_loss = 0.0
+            for step, batch in enumerate(dataloader):
+                features, labels = batch
+                # student forward through the shared SoftmaxLoss head
+                reps = [self.student(sentence_feature)['sentence_embedding']
+                        for sentence_feature in features]
+                u, v = reps
+                student_logits = self.student_loss.classifier(
+                    torch.cat([u, v, torch.abs(u - v)], dim=1))
+
+                texts_a, texts_b = self._batch_texts(features)
+                teacher_logits = self._teacher_logits(texts_a, texts_b).to(student_logits.device)
+
+                loss = self._distillation_loss(student_logits, teacher_logits, labels.to(student_logits.device))
+                loss.backward()
+                optimizer.step()
+                optimizer.zero_grad()
+                epoch_loss += loss.item()
+            self.logger.info('Distillation epoch %d done, mean loss %.4f',
+                             epoch + 1, epoch_loss / max(1, len(dataloader)))
+
+    def _batch_texts(self, features) -> Tuple[List[str], List[str]]:
+        """
+        Recover raw sentence pairs from tokenized batch features so the
+        teacher (which has its own vocabulary) can re-tokenize them.
+        """
+        decode = self.student.tokenizer.decode
+        texts_a = [decode(ids, skip_special_tokens=True) for ids in features[0]['input_ids']]
+        texts_b = [decode(ids, skip_special_tokens=True) for ids in features[1]['input_ids']]
+        return texts_a, texts_b
+
+    def save_model(self):
+        """
+        Method used for distilled model saving in the same layout the
+        inference config expects (bert_model_trained + classifier_model).
+        """
+        torch.save(self.student_loss.classifier.cpu(), self.path_to_save + 'classifier_model')
+        self.student.save(self.path_to_save + "bert_model_trained")
+        self.logger.info(f"Distilled model saved to {self.path_to_save}")
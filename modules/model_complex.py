@@ -30,7 +30,11 @@ class WikiFactChecker:
 
         self.model_level_one = WikiCandidatesSelector(**model_level_one_config)
         self.logger.info("Model level one is loaded.")
-        self.model_level_two = SentenceNLIModel(**model_level_two_config)
+        if model_level_two_config.get('backend', 'pytorch') == 'onnx':
+            from modules.onnx_sentence_bert import ONNXSentenceNLIModel
+            self.model_level_two = ONNXSentenceNLIModel(**model_level_two_config)
+        else:
+            self.model_level_two = SentenceNLIModel(**model_level_two_config)
         self.logger.info("Model level two is loaded.")
         self.logger.info("Aggregation stage is not loaded")
     def predict_all(self, claim: str):
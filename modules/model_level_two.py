@@ -1,3 +1,6 @@
+import contextlib
+from pathlib import Path
+
 import torch
 import numpy as np
 from typing import *
@@ -22,10 +25,30 @@ class SentenceNLIModel:
         self.profiler = kwargs.get('profiler', DEFAULT_MEASURER)
 
         self.bert_model = SentenceTransformer(bert_model_path)
+        self._load_mmapped_weights(bert_model_path)
         if torch.cuda.is_available():
             self.classification_model = torch.load(classification_model_path).cuda()
         else:
             self.classification_model = torch.load(classification_model_path)
+
+        self.use_bf16 = False
+        if kwargs.get('use_ipex', False) and not torch.cuda.is_available():
+            try:
+                import intel_extension_for_pytorch as ipex
+                self.bert_model = ipex.optimize(self.bert_model.eval(),
+                                                dtype=torch.bfloat16, inplace=True)
+                self.classification_model = ipex.optimize(self.classification_model.eval(),
+                                                          dtype=torch.bfloat16, inplace=True)
+                self.use_bf16 = True
+                self.logger.info("IPEX BF16 optimization is applied.")
+            except ImportError:
+                self.logger.warning("use_ipex is set but intel_extension_for_pytorch "
+                                    "is not installed, falling back to FP32 eager mode.")
+
+        self.max_length = kwargs.get('max_length', 128)
+        self._traced_encoder = None
+        if kwargs.get('use_torchscript', False) and not torch.cuda.is_available():
+            self._build_traced_encoder()
         self.logger.info("Models are loaded and ready to use.")
 
         if not label2int:
@@ -35,29 +58,112 @@ class SentenceNLIModel:
         self.int2label = {v: k for k, v in self.label2int.items()}
         self.logger.info(f"Labels encoding is {self.label2int}")
 
+    def _load_mmapped_weights(self, bert_model_path: str):
+        """
+        Re-load encoder weights from a safetensors file when one was produced
+        by scripts/convert_to_safetensors.py. safetensors mmaps the file, so
+        server processes loading the same checkpoint share the physical pages
+        instead of each holding a private copy of the encoder weights.
+        :param bert_model_path: path to saved fine-tuned bert model
+        """
+        safetensors_path = Path(bert_model_path) / 'model.safetensors'
+        if not safetensors_path.exists():
+            return
+        from safetensors.torch import load_file
+        state = load_file(str(safetensors_path), device='cpu')
+        encoder = self.bert_model._first_module().auto_model
+        try:
+            encoder.load_state_dict(state, assign=True)
+        except TypeError:
+            # torch < 2.0 has no assign and copies into private storage,
+            # which loads fine but loses the page sharing
+            encoder.load_state_dict(state)
+        self.logger.info(f"Encoder weights are mmapped from {safetensors_path}")
+
+    def _build_traced_encoder(self):
+        """
+        Trace encoder + mean pooling once on a fixed (1, max_length) shape and
+        freeze the graph, so CPU inference runs through the oneDNN graph fuser
+        (fused Linear+GELU, LayerNorm constant folding) instead of dispatching
+        every op through eager mode.
+        """
+        class _PooledEncoder(torch.nn.Module):
+            def __init__(self, encoder):
+                super().__init__()
+                self.encoder = encoder
+
+            def forward(self, input_ids, attention_mask):
+                token_embeddings = self.encoder(input_ids=input_ids, attention_mask=attention_mask)[0]
+                mask = attention_mask.unsqueeze(-1).float()
+                return (token_embeddings * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+
+        if hasattr(torch._C, '_jit_set_llga_enabled'):
+            torch._C._jit_set_llga_enabled(True)
+
+        first_module = self.bert_model._first_module()
+        self._tokenizer = first_module.tokenizer
+        dummy_ids = torch.ones((1, self.max_length), dtype=torch.long)
+        dummy_mask = torch.ones_like(dummy_ids)
+        with torch.no_grad():
+            traced = torch.jit.trace(_PooledEncoder(first_module.auto_model.eval()),
+                                     (dummy_ids, dummy_mask), strict=False)
+            if hasattr(torch.jit, 'freeze'):
+                traced = torch.jit.freeze(traced)
+            # two warm passes so the fuser specializes the frozen graph
+            traced(dummy_ids, dummy_mask)
+            traced(dummy_ids, dummy_mask)
+        self._traced_encoder = traced
+        self.logger.info("Encoder is traced and frozen for fixed-shape CPU inference.")
+
+    def _encode_traced(self, sentences: List[str]) -> torch.Tensor:
+        """
+        Encode sentences through the traced graph, padded to max_length so the
+        input shape is constant across requests.
+        :param sentences: list of texts to embed
+        """
+        encoded = self._tokenizer(sentences, padding='max_length', truncation=True,
+                                  max_length=self.max_length, return_tensors='pt')
+        return self._traced_encoder(encoded['input_ids'], encoded['attention_mask'])
+
+    def _autocast_context(self):
+        """
+        BF16 autocast context for the forward pass when IPEX is enabled,
+        no-op otherwise.
+        """
+        if self.use_bf16:
+            return torch.cpu.amp.autocast(dtype=torch.bfloat16)
+        return contextlib.nullcontext()
+
     def predict(self, text: str = "", hypothesis: str = ""):
         """
         Method used to predict relation between pair of texts.
         """
-        embeddings = self.bert_model.encode([text, hypothesis], show_progress_bar=False, convert_to_numpy=False)
-        stacked_features = self._vector_stacking_logic(embeddings)
+        with torch.no_grad(), self._autocast_context():
+            if self._traced_encoder is not None:
+                embeddings = self._encode_traced([text, hypothesis])
+            else:
+                embeddings = self.bert_model.encode([text, hypothesis], show_progress_bar=False, convert_to_numpy=False)
+            stacked_features = self._vector_stacking_logic(embeddings)
 
-        probs = self.classification_model(stacked_features).detach().cpu().numpy()
+            probs = self.classification_model(stacked_features).detach().float().cpu().numpy()
         final_label = self.int2label.get(np.argmax(probs))
         probs = self._normalize_probs(probs)
 
         return {"label": final_label,
-                'contradiction_prob': probs[0],
-                'entailment_prob': probs[1],
-                'neutral_prob': probs[2]}
+                'contradiction_prob': float(probs[0]),
+                'entailment_prob': float(probs[1]),
+                'neutral_prob': float(probs[2])}
 
     def predict_batch(self, texts, hypothesis, return_cosine: bool = False):
 
         if isinstance(hypothesis, str):
             raise AttributeError("Hypothesis should be a list in case of batch processing.")
+        if len(hypothesis) == 0:
+            return {'probs': [], 'cosines': []}
 
         self.profiler.start_measure_local('embedding_claim')
-        embeddings_claim = self.bert_model.encode(texts, show_progress_bar=False, convert_to_numpy=False)
+        with torch.no_grad(), self._autocast_context():
+            embeddings_claim = self.bert_model.encode(texts, show_progress_bar=False, convert_to_numpy=False)
         self.profiler.finish_measure_local()
 
         if isinstance(texts, str):
@@ -66,7 +172,8 @@ class SentenceNLIModel:
             embeddings_texts = embeddings_claim
 
         self.profiler.start_measure_local('embedding_hypothesis')
-        embeddings_hypothesis = self.bert_model.encode(hypothesis, show_progress_bar=False, convert_to_numpy=False)
+        with torch.no_grad(), self._autocast_context():
+            embeddings_hypothesis = self.bert_model.encode(hypothesis, show_progress_bar=False, convert_to_numpy=False)
         self.profiler.finish_measure_local()
 
         cosines = []
@@ -75,17 +182,13 @@ class SentenceNLIModel:
             for e_claim, e_hypothesis in zip(embeddings_texts, embeddings_hypothesis):
                 cosines.append(cos(e_claim, e_hypothesis).item())
 
-        results = []
         self.profiler.start_measure_local('classification')
-        for embeddings in zip(embeddings_texts, embeddings_hypothesis):
-            stacked_features = self._vector_stacking_logic(embeddings)
-            results.append(self._normalize_probs(self.classification_model(stacked_features).detach().cpu().numpy()))
-            var1 = self.classification_model(stacked_features)
-            var2 = var1.detach()
-            var3 = var2.cpu()
-            var4 = var3.numpy()
-            var5 = self._normalize_probs(var4)
-
+        with torch.no_grad(), self._autocast_context():
+            u = torch.stack(list(embeddings_texts))
+            v = torch.stack(list(embeddings_hypothesis))
+            stacked_features = torch.cat([u, v, torch.abs(u - v)], dim=1)
+            all_probs = self.classification_model(stacked_features).detach().float().cpu().numpy()
+        results = [self._normalize_probs(p) for p in all_probs]
         self.profiler.finish_measure_local()
 
         return {'probs': results, 'cosines': cosines}
@@ -1,8 +1,9 @@
+from typing import *
 from logging import Logger
-from tqdm.auto import tqdm
 import math
 
 import torch
+import numpy as np
 import pandas as pd
 from torch.utils.data import DataLoader
 from sentence_transformers import models, losses
@@ -10,7 +11,31 @@ from sentence_transformers import SentencesDataset, LoggingHandler, SentenceTran
 from sentence_transformers.evaluation import EmbeddingSimilarityEvaluator, LabelAccuracyEvaluator
 from sentence_transformers.readers import *
 
-from fairapi.modules.snli_utils import _create_examples_fever, _create_examples_snli, _create_examples_mnli, _read_tsv
+from modules.utils.snli_utils import _create_examples_fever, _create_examples_snli, _create_examples_mnli, _read_tsv_frame
+
+
+def _read_fever(path):
+    df = pd.read_csv(path)
+    df.dropna(inplace=True)
+    df.reset_index(drop=True, inplace=True)
+    return df
+
+
+def _read_mnli(path):
+    df = pd.read_table(path, error_bad_lines=False)
+    df.sentence1 = df.sentence1.astype(str)
+    df.sentence2 = df.sentence2.astype(str)
+    df.gold_label = df.gold_label.astype(str)
+    df = df[df.gold_label != '-']
+    df.dropna(inplace=True)
+    return df
+
+
+_FORMAT_READERS = {
+    'snli': (_read_tsv_frame, _create_examples_snli),
+    'fever': (_read_fever, _create_examples_fever),
+    'mnli': (_read_mnli, _create_examples_mnli),
+}
 
 
 class BertTrainer:
@@ -30,6 +55,12 @@ class BertTrainer:
 
         self.base_model = base_model
         self.batch_size = batch_size
+        # both default off: sentence-transformers' smart_batching_collate moves
+        # tensors to the target device inside collate, which cannot run in
+        # forked workers on CUDA and leaves nothing pageable to pin. Opt in via
+        # config for CPU training, where collate stays on the host.
+        self.num_workers = kwargs.get('num_workers', 0)
+        self.pin_memory = kwargs.get('pin_memory', False)
 
         dataset = 'snli'
         if dataset == 'snli':
@@ -53,38 +84,57 @@ class BertTrainer:
                                                  sentence_embedding_dimension=self.model.get_sentence_embedding_dimension(),
                                                  num_labels=len(self.label2int))
 
+    def _build_samples(self, df: pd.DataFrame) -> List[InputExample]:
+        """
+        Build InputExample list from examples dataframe (guid, s1, s2, label)
+        with a single pass: labels are mapped in one vectorized call and the
+        only Python-level loop left is the InputExample construction itself.
+        :param df: examples dataframe produced by _create_examples_*
+        """
+        label_ids = df['label'].map(self.label2int).to_numpy(dtype=np.int64)
+        return [InputExample(guid=g, texts=[a, b], label=int(l))
+                for g, a, b, l in zip(df['guid'].values, df['s1'].values, df['s2'].values, label_ids)]
+
+    def _build_loader(self, samples: List[InputExample]) -> DataLoader:
+        """
+        Build DataLoader, optionally with persistent pinned-memory workers so
+        batches are prepared ahead of the training step. prefetch_factor stays
+        at 2 to keep pinned-memory usage bounded.
+        :param samples: list of InputExample built by _build_samples
+        """
+        data = SentencesDataset(samples, model=self.model)
+        loader_params = dict(shuffle=True, batch_size=self.batch_size, pin_memory=self.pin_memory)
+        if self.num_workers > 0:
+            loader_params.update(num_workers=self.num_workers,
+                                 persistent_workers=True,
+                                 prefetch_factor=2)
+        return DataLoader(data, **loader_params)
+
+    def _prepare(self, data_format: str):
+        """
+        Shared data preparation pipeline: read the three splits with the
+        format-specific reader, build samples and dataloaders once.
+        :param data_format: one of snli, fever, mnli
+        """
+        reader, examples_fn = _FORMAT_READERS[data_format]
+
+        train_examples = examples_fn(reader(self.train_path), 'train_s')
+        dev_examples = examples_fn(reader(self.dev_path), 'dev_s')
+        test_examples = examples_fn(reader(self.test_path), 'test_s')
+        # Convert the dataset to a DataLoader ready for training
+        self.logger.info("Read train dataset")
+
+        self.train_dataloader_nli = self._build_loader(self._build_samples(train_examples))
+        self.dev_dataloader_nli = self._build_loader(self._build_samples(dev_examples))
+        self.test_dataloader_nli = self._build_loader(self._build_samples(test_examples))
+
     def preparing_data(self):
         """
         Method used for data preparation before training
         it reads data from files predefined in config and process them
         Uses for SNLI data format
         """
-        train_snli = _create_examples_snli(_read_tsv(self.train_path), 'train_s')
-        dev_snli = _create_examples_snli(_read_tsv(self.dev_path), 'dev_s')
-        test_snli = _create_examples_snli(_read_tsv(self.test_path), 'test_s')
-        # Convert the dataset to a DataLoader ready for training
-        self.logger.info("Read train dataset")
-
-        train_nli_samples = []
-        dev_nli_samples = []
-        test_nli_samples = []
-
-        for row in tqdm(train_snli):
-            label_id = self.label2int[row[3]]
-            train_nli_samples.append(InputExample(guid=row[0], texts=[row[1], row[2]], label=label_id))
-        for row in tqdm(dev_snli):
-            label_id = self.label2int[row[3]]
-            dev_nli_samples.append(InputExample(guid=row[0], texts=[row[1], row[2]], label=label_id))
-        for row in tqdm(test_snli):
-            label_id = self.label2int[row[3]]
-            test_nli_samples.append(InputExample(guid=row[0], texts=[row[1], row[2]], label=label_id))
-
-        train_data_nli = SentencesDataset(train_nli_samples, model=self.model)
-        self.train_dataloader_nli = DataLoader(train_data_nli, shuffle=True, batch_size=self.batch_size)
-        dev_data_nli = SentencesDataset(dev_nli_samples, model=self.model)
-        self.dev_dataloader_nli = DataLoader(dev_data_nli, shuffle=True, batch_size=self.batch_size)
-        test_data_nli = SentencesDataset(test_nli_samples, model=self.model)
-        self.test_dataloader_nli = DataLoader(test_data_nli, shuffle=True, batch_size=self.batch_size)
+        return self._prepare('snli')
 
     def preparing_data_fever(self):
         """
@@ -92,39 +142,7 @@ class BertTrainer:
         it reads data from files predefined in config and process them
         Uses for FEVER SNLI-style data format
         """
-        def read_fever(path):
-            df = pd.read_csv(path)
-            df.dropna(inplace=True)
-            df.reset_index(drop=True, inplace=True)
-            return df
-
-        train_snli = _create_examples_fever(read_fever(self.train_path), 'train_s')
-        dev_snli = _create_examples_fever(read_fever(self.dev_path), 'dev_s')
-        test_snli = _create_examples_fever(read_fever(self.test_path), 'test_s')
-
-        # Convert the dataset to a DataLoader ready for training
-        self.logger.info("Read train dataset")
-
-        train_nli_samples = []
-        dev_nli_samples = []
-        test_nli_samples = []
-
-        for row in tqdm(train_snli):
-            label_id = self.label2int[row[3]]
-            train_nli_samples.append(InputExample(guid=row[0], texts=[row[1], row[2]], label=label_id))
-        for row in tqdm(dev_snli):
-            label_id = self.label2int[row[3]]
-            dev_nli_samples.append(InputExample(guid=row[0], texts=[row[1], row[2]], label=label_id))
-        for row in tqdm(test_snli):
-            label_id = self.label2int[row[3]]
-            test_nli_samples.append(InputExample(guid=row[0], texts=[row[1], row[2]], label=label_id))
-
-        train_data_nli = SentencesDataset(train_nli_samples, model=self.model)
-        self.train_dataloader_nli = DataLoader(train_data_nli, shuffle=True, batch_size=self.batch_size)
-        dev_data_nli = SentencesDataset(dev_nli_samples, model=self.model)
-        self.dev_dataloader_nli = DataLoader(dev_data_nli, shuffle=True, batch_size=self.batch_size)
-        test_data_nli = SentencesDataset(test_nli_samples, model=self.model)
-        self.test_dataloader_nli = DataLoader(test_data_nli, shuffle=True, batch_size=self.batch_size)
+        return self._prepare('fever')
 
     def preparing_data_mnli(self):
         """
@@ -132,44 +150,7 @@ class BertTrainer:
          it reads data from files predefined in config and process them
          Uses for MNLI data format
         """
-        def read_mnli(path):
-            df = pd.read_table(path, error_bad_lines=False)
-            df.sentence1 = df.sentence1.astype(str)
-            df.sentence2 = df.sentence2.astype(str)
-            df.gold_label = df.gold_label.astype(str)
-            df = df[df.gold_label != '-']
-            df.dropna(inplace=True)
-            return df
-
-        train_snli = _create_examples_mnli(read_mnli(self.train_path), 'train_s')
-        dev_snli = _create_examples_mnli(read_mnli(self.dev_path), 'dev_s')
-        test_snli = _create_examples_mnli(read_mnli(self.test_path), 'test_s')
-
-        # Convert the dataset to a DataLoader ready for training
-        self.logger.info("Read train dataset")
-
-        train_nli_samples = []
-        dev_nli_samples = []
-        test_nli_samples = []
-
-        print(len(train_snli))
-        for row in tqdm(train_snli):
-            label_id = self.label2int[row[3]]
-            train_nli_samples.append(InputExample(guid=row[0], texts=[row[1], row[2]], label=label_id))
-        for row in tqdm(dev_snli):
-            label_id = self.label2int[row[3]]
-            dev_nli_samples.append(InputExample(guid=row[0], texts=[row[1], row[2]], label=label_id))
-        for row in tqdm(test_snli):
-            label_id = self.label2int[row[3]]
-            test_nli_samples.append(InputExample(guid=row[0], texts=[row[1], row[2]], label=label_id))
-
-        print(len(train_nli_samples))
-        train_data_nli = SentencesDataset(train_nli_samples, model=self.model)
-        self.train_dataloader_nli = DataLoader(train_data_nli, shuffle=True, batch_size=self.batch_size)
-        dev_data_nli = SentencesDataset(dev_nli_samples, model=self.model)
-        self.dev_dataloader_nli = DataLoader(dev_data_nli, shuffle=True, batch_size=self.batch_size)
-        test_data_nli = SentencesDataset(test_nli_samples, model=self.model)
-        self.test_dataloader_nli = DataLoader(test_data_nli, shuffle=True, batch_size=self.batch_size)
+        return self._prepare('mnli')
 
     def save_model(self):
         """
@@ -0,0 +1,191 @@
+import os
+from pathlib import Path
+from typing import *
+from logging import Logger
+
+import torch
+import numpy as np
+import onnxruntime
+from transformers import AutoTokenizer
+
+from modules.model_level_two import SentenceNLIModel
+from modules.utils.logging_utils import DEFAULT_LOGGER, DEFAULT_MEASURER
+
+QUANTIZED_MODEL_NAME = "model_quantized.onnx"
+
+
+class ONNXSentenceNLIModel:
+    """
+    Drop-in replacement for SentenceNLIModel that runs the transformer encoder
+    through an INT8-quantized ONNX Runtime session instead of eager PyTorch.
+    The export and dynamic quantization happen once at load time, after that the
+    quantized graph is reused from disk.
+    :param bert_model_path: path to saved fine-tuned bert model
+    :param classification_model_path: path to saved fine-tuned classification_model
+    :param logger: logger to use in model
+    """
+    def __init__(self, bert_model_path: str, classification_model_path: str,
+                 logger: Logger = DEFAULT_LOGGER, label2int: dict = None, **kwargs):
+
+        self.logger = logger
+        self.profiler = kwargs.get('profiler', DEFAULT_MEASURER)
+        self.max_length = kwargs.get('max_length', 128)
+        self.encode_batch_size = kwargs.get('encode_batch_size', 64)
+        # config lists provider options as [name, options] pairs, onnxruntime wants tuples
+        self.providers = [tuple(p) if isinstance(p, (list, tuple)) else p
+                          for p in kwargs.get('providers', ['CPUExecutionProvider'])]
+
+        onnx_path = self._export_and_quantize(bert_model_path)
+        self.session = self._build_session(onnx_path)
+        self._input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(str(onnx_path.parent), use_fast=True)
+        assert self.tokenizer.is_fast, "Rust fast tokenizer is required on the inference path"
+
+        self.classification_model = torch.load(classification_model_path, map_location='cpu')
+        self.logger.info("ONNX models are loaded and ready to use.")
+
+        if not label2int:
+            self.label2int = {"SUPPORTS": 1, "REFUTES": 0, "NOT ENOUGH INFO": 2}
+        else:
+            self.label2int = label2int
+        self.int2label = {v: k for k, v in self.label2int.items()}
+        self.logger.info(f"Labels encoding is {self.label2int}")
+
+    def _export_and_quantize(self, bert_model_path: str) -> Path:
+        """
+        Export the encoder to ONNX and apply INT8 dynamic quantization (AVX-512 VNNI).
+        Skipped when the quantized graph already exists next to the checkpoint.
+        :param bert_model_path: path to saved fine-tuned bert model
+        :return path to the quantized onnx file
+        """
+        onnx_dir = Path(bert_model_path) / "onnx"
+        quantized_path = onnx_dir / QUANTIZED_MODEL_NAME
+        if quantized_path.exists():
+            self.logger.info(f"Found quantized model at {quantized_path}, skipping export.")
+            return quantized_path
+
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        from sentence_transformers import SentenceTransformer
+
+        # the checkpoint is sentence-transformers layout (modules.json +
+        # 0_Transformer/), which optimum cannot read directly — materialize a
+        # transformers-layout copy of the encoder and tokenizer first
+        self.logger.info(f"Exporting {bert_model_path} to ONNX and quantizing to INT8 ...")
+        first_module = SentenceTransformer(bert_model_path)._first_module()
+        hf_dir = onnx_dir / 'hf_checkpoint'
+        first_module.auto_model.save_pretrained(hf_dir)
+        first_module.tokenizer.save_pretrained(hf_dir)
+        first_module.tokenizer.save_pretrained(onnx_dir)
+
+        ort_model = ORTModelForFeatureExtraction.from_pretrained(hf_dir, export=True)
+        ort_model.save_pretrained(onnx_dir)
+
+        quantizer = ORTQuantizer.from_pretrained(onnx_dir)
+        quantization_config = AutoQuantizationConfig.avx512_vnni(is_static=False)
+        quantizer.quantize(save_dir=onnx_dir, quantization_config=quantization_config)
+        self.logger.info(f"Quantized model saved to {quantized_path}")
+        return quantized_path
+
+    def _build_session(self, onnx_path: Path) -> onnxruntime.InferenceSession:
+        """
+        Build inference session on the configured providers with all graph
+        optimizations enabled and one intra-op thread per physical core.
+        :param onnx_path: path to onnx model file
+        """
+        sess_options = onnxruntime.SessionOptions()
+        sess_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # respect the worker's pinned cpuset (see gunicorn_conf post_fork)
+        # instead of oversubscribing every session to the whole machine
+        sess_options.intra_op_num_threads = max(1, len(os.sched_getaffinity(0)))
+        return onnxruntime.InferenceSession(str(onnx_path), sess_options,
+                                            providers=self.providers)
+
+    def _encode(self, sentences: List[str], fixed_shape: bool = False) -> np.ndarray:
+        """
+        Tokenize sentences and run one batched forward through the ONNX session,
+        mean-pooling token embeddings with the attention mask.
+        :param sentences: list of texts to embed
+        :param fixed_shape: pad to max_length so the session always sees the
+            same input shape (used on the per-request path to avoid shape
+            re-specialization); batch paths keep dynamic padding
+        :return array of sentence embeddings, one row per input
+        """
+        embeddings = []
+        # chunk long candidate lists so one forward never exceeds encode_batch_size rows
+        for start in range(0, len(sentences), self.encode_batch_size):
+            chunk = sentences[start:start + self.encode_batch_size]
+            encoded = self.tokenizer(chunk, padding='max_length' if fixed_shape else True,
+                                     truncation=True, max_length=self.max_length,
+                                     return_tensors='np')
+            input_feed = {'input_ids': encoded['input_ids'].astype(np.int64),
+                          'attention_mask': encoded['attention_mask'].astype(np.int64)}
+            if 'token_type_ids' in self._input_names:
+                input_feed['token_type_ids'] = encoded['token_type_ids'].astype(np.int64)
+
+            token_embeddings = self.session.run(None, input_feed)[0]
+            mask = encoded['attention_mask'][..., None].astype(np.float32)
+            embeddings.append((token_embeddings * mask).sum(axis=1) /
+                              np.clip(mask.sum(axis=1), 1e-9, None))
+        return np.concatenate(embeddings, axis=0)
+
+    def predict(self, text: str = "", hypothesis: str = ""):
+        """
+        Method used to predict relation between pair of texts.
+        """
+        embeddings = self._encode([text, hypothesis], fixed_shape=True)
+        stacked_features = self._vector_stacking_logic(embeddings)
+
+        with torch.no_grad():
+            probs = self.classification_model(torch.from_numpy(stacked_features)).cpu().numpy()
+        final_label = self.int2label.get(np.argmax(probs))
+        probs = SentenceNLIModel._normalize_probs(probs)
+
+        return {"label": final_label,
+                'contradiction_prob': float(probs[0]),
+                'entailment_prob': float(probs[1]),
+                'neutral_prob': float(probs[2])}
+
+    def predict_batch(self, texts, hypothesis, return_cosine: bool = False):
+
+        if isinstance(hypothesis, str):
+            raise AttributeError("Hypothesis should be a list in case of batch processing.")
+        if len(hypothesis) == 0:
+            return {'probs': [], 'cosines': []}
+
+        self.profiler.start_measure_local('embedding_claim')
+        embeddings_claim = self._encode([texts] if isinstance(texts, str) else texts)
+        self.profiler.finish_measure_local()
+
+        if isinstance(texts, str):
+            embeddings_texts = np.repeat(embeddings_claim, len(hypothesis), axis=0)
+        else:
+            embeddings_texts = embeddings_claim
+
+        self.profiler.start_measure_local('embedding_hypothesis')
+        embeddings_hypothesis = self._encode(hypothesis)
+        self.profiler.finish_measure_local()
+
+        cosines = []
+        if return_cosine:
+            for e_claim, e_hypothesis in zip(embeddings_texts, embeddings_hypothesis):
+                cosines.append(float(np.dot(e_claim, e_hypothesis) /
+                                     (np.linalg.norm(e_claim) * np.linalg.norm(e_hypothesis) + 1e-6)))
+
+        self.profiler.start_measure_local('classification')
+        stacked_features = np.concatenate([embeddings_texts, embeddings_hypothesis,
+                                           np.abs(embeddings_texts - embeddings_hypothesis)], axis=1)
+        with torch.no_grad():
+            all_probs = self.classification_model(torch.from_numpy(stacked_features)).cpu().numpy()
+        results = [SentenceNLIModel._normalize_probs(p) for p in all_probs]
+        self.profiler.finish_measure_local()
+
+        return {'probs': results, 'cosines': cosines}
+
+    @staticmethod
+    def _vector_stacking_logic(vectors) -> np.array:
+        """
+        Implements vectors stacking logic after bert model before classifier
+        :param vectors: list of two embedding corresponds to two input vectors.
+        """
+        return np.concatenate([vectors[0], vectors[1], np.abs(vectors[0] - vectors[1])], axis=0)
@@ -1,7 +1,4 @@
 import sys
-import json
-from argparse import ArgumentParser
-from pathlib import Path
 sys.path.insert(0, "/Users/ntr/Documents/tresh/fairapi")
 
 import streamlit as st
@@ -12,21 +9,9 @@ from colour import Color
 @st.cache(allow_output_mutation=True)
 def get_converters():
     from modules.model_complex import WikiFactChecker
-    from modules.utils.logging_utils import get_logger, ROOT_LOGGER_NAME, DEFAULT_LOGGER
-
-    parser = ArgumentParser()
-    parser.add_argument('--config', type=str, required=False,
-                        default='configs/inference/sentence_bert_config.json', help='path to config')
-
-    args = parser.parse_args()
-    config_path = args.config
-    logger = DEFAULT_LOGGER
-
-    logger.info(f"Reading config from {Path(config_path).absolute()}")
-    with open(config_path) as con_file:
-        config = json.load(con_file)
-    logger.info(f"Using config {config}")
+    from modules.bootstrap import load_config_and_logger
 
+    config, logger = load_config_and_logger('configs/inference/sentence_bert_config.json')
     complex_model = WikiFactChecker(config, logger=logger)
 
     return complex_model
@@ -1,5 +1,8 @@
 from typing import *
 import logging
+import logging.handlers
+import queue
+import sys
 from pathlib import Path
 from datetime import datetime
 import csv
@@ -18,6 +21,9 @@ ROOT_LOGGER_NAME = 'NLI_API'
 
 DEFAULT_LOGGER = logging.getLogger("DEFAULT")
 
+# listeners are kept module-level so their threads live as long as the process
+_QUEUE_LISTENERS = []
+
 
 def get_logger(name: str,
                log_level: Union[str, int] = None,
@@ -51,10 +57,17 @@ def get_logger(name: str,
             file_handler.setLevel(log_level)
             logger.addHandler(file_handler)
         if console:
-            console_handler = logging.StreamHandler()
+            # formatting and I/O happen on a background listener thread,
+            # the request path only pays for an in-memory queue put
+            console_handler = logging.StreamHandler(sys.stdout)
             console_handler.setFormatter(formatter)
-            console_handler.setLevel(log_level)
-            logger.addHandler(console_handler)
+            log_queue = queue.Queue(-1)
+            queue_handler = logging.handlers.QueueHandler(log_queue)
+            queue_handler.setLevel(log_level)
+            logger.addHandler(queue_handler)
+            listener = logging.handlers.QueueListener(log_queue, console_handler)
+            listener.start()
+            _QUEUE_LISTENERS.append(listener)
         logger.setLevel(log_level)
     return logger
 
@@ -1,6 +1,8 @@
 import csv
 import sys
 
+import pandas as pd
+
 
 def _read_tsv(input_file, quotechar=None):
     """Reads a tab separated value file."""
@@ -14,6 +16,13 @@ def _read_tsv(input_file, quotechar=None):
         return lines
 
 
+def _read_tsv_frame(input_file, quotechar=None):
+    """Reads a tab separated value file into a dataframe with the pandas C parser."""
+    return pd.read_csv(input_file, sep="\t", header=0, dtype=str, engine="c",
+                       quoting=csv.QUOTE_NONE if quotechar is None else csv.QUOTE_MINIMAL,
+                       quotechar=quotechar or '"', keep_default_na=False)
+
+
 def _read_csv(input_file, quotechar=None):
     """Reads a comma separated value file."""
     with open(input_file, "r", encoding='utf-8') as f:
@@ -27,40 +36,26 @@ def _read_csv(input_file, quotechar=None):
 
 
 def _create_examples_snli(lines, set_type):
-    """Creates examples for the training and dev sets."""
-    examples = []
-    for (i, line) in enumerate(lines):
-        if i == 0:
-            continue
-        guid = "%s-%s" % (set_type, line[0])
-        text_a = line[7]
-        text_b = line[8]
-        label = line[-1]
-        examples.append([guid, text_a, text_b, label])
-    return examples
+    """Creates examples dataframe (guid, s1, s2, label) for the training and dev sets."""
+    if not isinstance(lines, pd.DataFrame):
+        lines = pd.DataFrame(lines[1:])
+    return pd.DataFrame({'guid': set_type + '-' + lines.iloc[:, 0].astype(str),
+                         's1': lines.iloc[:, 7],
+                         's2': lines.iloc[:, 8],
+                         'label': lines.iloc[:, -1]})
 
 
 def _create_examples_mnli(lines, set_type):
-    """Creates examples for the training and dev sets."""
-    examples = []
-    for i, line in lines.iterrows():
-        if i == 0:
-            continue
-        text_a = str(line.sentence1)
-        text_b = str(line.sentence2)
-        label = line.gold_label
-        examples.append([i, text_a, text_b, label])
-    return examples
+    """Creates examples dataframe (guid, s1, s2, label) for the training and dev sets."""
+    return pd.DataFrame({'guid': lines.index,
+                         's1': lines.sentence1.astype(str),
+                         's2': lines.sentence2.astype(str),
+                         'label': lines.gold_label})
 
 
 def _create_examples_fever(lines, set_type):
-    """Creates examples for the training and dev sets."""
-    examples = []
-    for i, line in lines.iterrows():
-        if i == 0:
-            continue
-        text_a = line.claim
-        text_b = line.hypothesis
-        label = line.label
-        examples.append([i, text_a, text_b, label])
-    return examples
\ No newline at end of file
+    """Creates examples dataframe (guid, s1, s2, label) for the training and dev sets."""
+    return pd.DataFrame({'guid': lines.index,
+                         's1': lines.claim,
+                         's2': lines.hypothesis,
+                         'label': lines.label})
\ No newline at end of file
@@ -0,0 +1,42 @@
+"""
+One-time conversion of the level-two encoder weights to a safetensors file.
+
+    python scripts/convert_to_safetensors.py --config configs/inference/sentence_bert_config.json
+
+safetensors files are mmapped on load, so when several server processes on
+one host (e.g. Gunicorn workers) load the same file, the kernel shares the
+physical pages between them instead of keeping one private copy of the
+encoder weights per process. SentenceNLIModel picks the file up automatically
+when it exists next to the checkpoint.
+"""
+import json
+from argparse import ArgumentParser
+from pathlib import Path
+
+from sentence_transformers import SentenceTransformer
+from safetensors.torch import save_file
+
+SAFETENSORS_WEIGHTS_NAME = 'model.safetensors'
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('--config', type=str, required=False,
+                        default='configs/inference/sentence_bert_config.json', help='path to config')
+    args = parser.parse_args()
+
+    with open(args.config) as con_file:
+        config = json.load(con_file)
+    bert_model_path = config['model_level_two']['bert_model_path']
+
+    sentence_model = SentenceTransformer(bert_model_path)
+    state = {k: v.contiguous() for k, v in
+             sentence_model._first_module().auto_model.state_dict().items()}
+
+    output_path = Path(bert_model_path) / SAFETENSORS_WEIGHTS_NAME
+    save_file(state, str(output_path))
+    print(f"Encoder weights saved to {output_path}")
+
+
+if __name__ == '__main__':
+    main()
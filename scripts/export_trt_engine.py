@@ -0,0 +1,91 @@
+"""
+Export the level-two NLI model (sentence-transformer encoder + softmax
+classifier) as a single ONNX graph and print the trtexec command that builds
+an INT8 TensorRT engine from it.
+
+Usage:
+    python scripts/export_trt_engine.py --config configs/inference/sentence_bert_config.json \
+        --output_dir models/trt
+
+To run the served encoder session on GPU through the TensorRT execution
+provider instead, set in the model_level_two config:
+
+    "backend": "onnx",
+    "providers": [["TensorrtExecutionProvider",
+                   {"trt_int8_enable": true, "trt_engine_cache_enable": true}],
+                  "CUDAExecutionProvider"]
+"""
+import json
+from argparse import ArgumentParser
+from pathlib import Path
+
+import torch
+from torch import nn
+from sentence_transformers import SentenceTransformer
+
+
+class NLIPairClassifier(nn.Module):
+    """
+    Encoder and classifier fused into one exportable graph.
+    Input rows alternate claim/hypothesis, so a batch of B pairs is a
+    (2B, S) tensor; output is (B, 3) class logits.
+    :param encoder: HF transformer backbone of the sentence-transformer
+    :param classifier: fine-tuned softmax classifier head
+    """
+    def __init__(self, encoder, classifier):
+        super().__init__()
+        self.encoder = encoder
+        self.classifier = classifier
+
+    def forward(self, input_ids, attention_mask):
+        token_embeddings = self.encoder(input_ids=input_ids, attention_mask=attention_mask)[0]
+        mask = attention_mask.unsqueeze(-1).float()
+        embeddings = (token_embeddings * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+        u, v = embeddings[0::2], embeddings[1::2]
+        features = torch.cat([u, v, torch.abs(u - v)], dim=1)
+        return self.classifier(features)
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('--config', type=str, required=False,
+                        default='configs/inference/sentence_bert_config.json', help='path to config')
+    parser.add_argument('--output_dir', type=str, required=False, default='models/trt',
+                        help='directory to write the onnx graph into')
+    parser.add_argument('--max_length', type=int, required=False, default=128,
+                        help='sequence length used for the dummy export input')
+    args = parser.parse_args()
+
+    with open(args.config) as con_file:
+        config = json.load(con_file)
+    model_level_two_config = config['model_level_two']
+
+    sentence_model = SentenceTransformer(model_level_two_config['bert_model_path'])
+    encoder = sentence_model._first_module().auto_model
+    classifier = torch.load(model_level_two_config['classification_model_path'], map_location='cpu')
+    module = NLIPairClassifier(encoder.eval(), classifier.eval())
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    onnx_path = output_dir / 'nli.onnx'
+
+    dummy_ids = torch.ones((2, args.max_length), dtype=torch.long)
+    dummy_mask = torch.ones_like(dummy_ids)
+    torch.onnx.export(module, (dummy_ids, dummy_mask), str(onnx_path),
+                      opset_version=17,
+                      input_names=['input_ids', 'attention_mask'],
+                      output_names=['logits'],
+                      dynamic_axes={'input_ids': {0: 'B', 1: 'S'},
+                                    'attention_mask': {0: 'B', 1: 'S'},
+                                    'logits': {0: 'B'}})
+    print(f"ONNX graph saved to {onnx_path}")
+    print("Build the INT8 engine with (calibrate the cache on ~500 SNLI dev pairs first):")
+    print(f"trtexec --onnx={onnx_path} --int8 --calib=calib.cache "
+          f"--minShapes=input_ids:2x16,attention_mask:2x16 "
+          f"--optShapes=input_ids:2x{args.max_length},attention_mask:2x{args.max_length} "
+          f"--maxShapes=input_ids:16x{args.max_length},attention_mask:16x{args.max_length} "
+          f"--saveEngine={output_dir / 'nli.plan'}")
+
+
+if __name__ == '__main__':
+    main()
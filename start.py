@@ -1,45 +1,37 @@
 import datetime
-import json
-from argparse import ArgumentParser
+import time
 
+import orjson
 from flask import Flask, request
 from werkzeug.middleware.proxy_fix import ProxyFix
 from flask_restx import Api, Resource, fields
 from flask_cors import CORS
-from pathlib import Path
 
+from modules.bootstrap import load_config_and_logger
 from modules.model_complex import WikiFactChecker
-from modules.utils.logging_utils import get_logger, check_if_none, ROOT_LOGGER_NAME, CSVLogger
-
-parser = ArgumentParser()
-parser.add_argument('--config', type=str, required=False,
-                    default='configs/inference/sentence_bert_config.json', help='path to config')
-
-args = parser.parse_args()
-config_path = args.config
-
-logger = get_logger(name=ROOT_LOGGER_NAME,
-                    console=True,
-                    log_level="INFO",
-                    propagate=False)
-
-logger.info(f"Reading config from {Path(config_path).absolute()}")
-with open(config_path) as con_file:
-    config = json.load(con_file)
-logger.info(f"Using config {config}")
+from modules.batching import MicroBatcher
+from modules.cache import PredictionCache
+from modules.utils.logging_utils import check_if_none, CSVLogger
 
+config, logger = load_config_and_logger('configs/inference/sentence_bert_config.json')
 
 logger.info(f"Loading models ...")
 complex_model = WikiFactChecker(config, logger=logger)
 file_logger = CSVLogger(config)
+batcher = MicroBatcher(complex_model.model_level_two, logger=logger,
+                       **config.get('batching', dict()))
+prediction_cache = PredictionCache(logger=logger, **config.get('cache', dict()))
 logger.info(f"Models loaded.")
 
-#complex_model = get_converters()
-claim = "san francisco's population is bigger than that of new york city "
-results = complex_model.predict_all(claim)
-print(results)
-
-exit(0)
+# a few dummy forwards so kernel autotuning / primitive caches are populated
+# before the first real request hits the model
+try:
+    warmup_start = time.perf_counter()
+    for _ in range(3):
+        complex_model.model_level_two.predict("warmup text.", "warmup hypothesis.")
+    logger.info("Warmup done in %.2fs", time.perf_counter() - warmup_start)
+except Exception as e:
+    logger.warning(f"Warmup failed: {e}")
 
 app = Flask(__name__)
 app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1, x_port=1)
@@ -47,6 +39,21 @@ CORS(app)
 
 api = Api(app, version=config.get("api_version", "0.4"), title='WikiCheck API')
 
+
+@api.representation('application/json')
+def output_json(data, code, headers=None):
+    """
+    Serialize responses with orjson: bytes go straight into the Response body,
+    numpy scalars are handled natively so long predict_all result lists skip
+    the per-field float conversion of stdlib json.
+    """
+    resp = app.response_class(orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY),
+                              mimetype='application/json')
+    resp.status_code = code
+    resp.headers.extend(headers or {})
+    return resp
+
+
 ns1 = api.namespace('nli_model', description=config.get('model_name', 'NLI model'))
 ns2 = api.namespace('fact_checking_model', description='Fact checking model')
 ns3 = api.namespace('fact_checking_aggregated', description='Fact checking model with aggregation')
@@ -83,23 +90,26 @@ class TodoList(Resource):
     @ns1.doc('trigger_model')
     @ns1.param('claim', _in='query')
     @ns1.param('hypothesis', _in='query')
-    @ns1.marshal_list_with(response)
+    @ns1.marshal_with(response)
     def get(self):
-        start_time = datetime.datetime.now()
+        start_time = time.perf_counter()
         claim = request.args.get('claim')
         hypothesis = request.args.get('hypothesis')
 
         text = check_if_none(claim)
         hypothesis = check_if_none(hypothesis)
 
-        logger.info(f'Query with params={{text: {text}, hypothesis: {hypothesis}}}')
-        result = complex_model.model_level_two.predict(text, hypothesis)
+        logger.info('Query with params={text: %s, hypothesis: %s}', text, hypothesis)
+        cache_key = prediction_cache.key(text, hypothesis)
+        result = prediction_cache.get(cache_key)
+        if result is None:
+            result = batcher.submit(text, hypothesis)
+            prediction_cache.put(cache_key, result)
 
-        end_time = datetime.datetime.now()
-        dif_time = str((end_time - start_time).total_seconds())
+        dif_time = time.perf_counter() - start_time
 
-        logger.info(f'[MODEL_LEVEL_TWO] API; ModelOne Get response; difference: {dif_time}')
-        logger.info(f'[MODEL_LEVEL_TWO] API; ModelFull sending the response')
+        logger.info('[MODEL_LEVEL_TWO] API; ModelOne Get response; difference: %.6f', dif_time)
+        logger.info('[MODEL_LEVEL_TWO] API; ModelFull sending the response')
 
         params_to_log = {
             "datetime": str(datetime.datetime.now()),
@@ -122,18 +132,17 @@ class TodoList(Resource):
     @ns2.marshal_with(response_model)
     def get(self):
 
-        start_time = datetime.datetime.now()
+        start_time = time.perf_counter()
         claim = request.args.get('claim')
         claim = check_if_none(claim)
 
-        logger.info(f'Query with params={{text: {claim}}}')
+        logger.info('Query with params={text: %s}', claim)
         result = complex_model.predict_all(claim)
 
-        end_time = datetime.datetime.now()
-        dif_time = str((end_time - start_time).total_seconds())
+        dif_time = time.perf_counter() - start_time
 
-        logger.info(f'[COMPLEX MODEL] API; ModelFull Get response; difference: {dif_time}')
-        logger.info(f'[COMPLEX MODEL] API; ModelFull sending the response')
+        logger.info('[COMPLEX MODEL] API; ModelFull Get response; difference: %.6f', dif_time)
+        logger.info('[COMPLEX MODEL] API; ModelFull sending the response')
 
         params_to_log = {
             "datetime": str(datetime.datetime.now()),
@@ -155,18 +164,17 @@ class TodoList(Resource):
     @ns3.param('claim', _in='query')
     @ns3.marshal_with(response_aggregated)
     def get(self):
-        start_time = datetime.datetime.now()
+        start_time = time.perf_counter()
         claim = request.args.get('claim')
         claim = check_if_none(claim)
 
-        logger.info(f'Query with params={{text: {claim}}}')
+        logger.info('Query with params={text: %s}', claim)
         result = complex_model.predict_and_aggregate(claim)
 
-        end_time = datetime.datetime.now()
-        dif_time = str((end_time - start_time).total_seconds())
+        dif_time = time.perf_counter() - start_time
 
-        logger.info(f'[COMPLEX MODEL. Aggregated] API; ModelFull Get response; difference: {dif_time}')
-        logger.info(f'[COMPLEX MODEL. Aggregated] API; ModelFull sending the response')
+        logger.info('[COMPLEX MODEL. Aggregated] API; ModelFull Get response; difference: %.6f', dif_time)
+        logger.info('[COMPLEX MODEL. Aggregated] API; ModelFull sending the response')
 
         params_to_log = {
             "datetime": str(datetime.datetime.now()),